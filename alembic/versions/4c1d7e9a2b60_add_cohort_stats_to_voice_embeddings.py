@@ -0,0 +1,30 @@
+"""add cohort stats to voice_embeddings
+
+Revision ID: 4c1d7e9a2b60
+Revises: b3279f4f4323
+Create Date: 2026-10-19 09:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1d7e9a2b60'
+down_revision: Union[str, Sequence[str], None] = 'b3279f4f4323'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('voice_embeddings', sa.Column('cohort_mean', sa.Float(), nullable=True))
+    op.add_column('voice_embeddings', sa.Column('cohort_std', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('voice_embeddings', 'cohort_std')
+    op.drop_column('voice_embeddings', 'cohort_mean')
@@ -0,0 +1,38 @@
+"""add updated_at to voice_embeddings
+
+Revision ID: 9e5b2f7c1d84
+Revises: 4c1d7e9a2b60
+Create Date: 2026-10-19 14:03:52.881264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e5b2f7c1d84'
+down_revision: Union[str, Sequence[str], None] = '4c1d7e9a2b60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # updated_at is naive UTC (datetime.utcnow in the model); CURRENT_TIMESTAMP is UTC on SQLite
+    # but session-local on PostgreSQL, so existing rows are backfilled with an explicit UTC default.
+    if op.get_bind().dialect.name == 'postgresql':
+        utc_now = sa.text("(now() AT TIME ZONE 'utc')")
+    else:
+        utc_now = sa.text('CURRENT_TIMESTAMP')
+    with op.batch_alter_table('voice_embeddings') as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=utc_now))
+        batch_op.create_index(batch_op.f('ix_voice_embeddings_updated_at'), ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('voice_embeddings') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_voice_embeddings_updated_at'))
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,29 @@
+"""add cohort_id to voice_embeddings
+
+Revision ID: d2a81f4c6e37
+Revises: 9e5b2f7c1d84
+Create Date: 2026-10-20 10:41:07.215983
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a81f4c6e37'
+down_revision: Union[str, Sequence[str], None] = '9e5b2f7c1d84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing stats have no cohort_id, so they are recomputed against the loaded cohort on use
+    op.add_column('voice_embeddings', sa.Column('cohort_id', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('voice_embeddings', 'cohort_id')
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, String, Text
+from sqlalchemy import Column, String, Text, Float, DateTime
 from sqlalchemy.ext.declarative import declarative_base
+from datetime import datetime
 
 Base = declarative_base()
 
@@ -7,3 +8,8 @@ class VoiceEmbedding(Base):
     __tablename__ = "voice_embeddings"
     user_id = Column(String, primary_key=True, index=True)
     embedding = Column(Text, nullable=False)  # ✅ Encrypted embedding stored as TEXT
+    cohort_mean = Column(Float, nullable=True)  # Enroll-side AS-norm stats, precomputed at enrollment
+    cohort_std = Column(Float, nullable=True)
+    cohort_id = Column(String(64), nullable=True)  # sha256 of the cohort file and top-k the stats belong to
+    # Naive UTC; snapshot deltas are the rows changed since the snapshot was exported
+    updated_at = Column(DateTime, nullable=False, index=True, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, HTTPException, Header
+from pydantic import BaseModel
+from typing import Optional
+from app.services.profiling import settings, refresh_settings, save_settings, TRACE_EXPORT_PATH, PROFILE_OUTPUT_DIR
+import os
+import secrets
+
+router = APIRouter()
+
+# Admin endpoints are disabled unless a token is configured
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+class ProfilingUpdate(BaseModel):
+    enabled: Optional[bool] = None
+    sample_rate: Optional[float] = None
+    cprofile: Optional[bool] = None
+
+def check_admin(token: Optional[str]):
+    if not ADMIN_TOKEN or not token or not secrets.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+def profiling_status():
+    return {**settings, "trace_export_path": TRACE_EXPORT_PATH, "profile_output_dir": PROFILE_OUTPUT_DIR,
+            "worker_pid": os.getpid()}
+
+@router.get("/profiling")
+def get_profiling(x_admin_token: Optional[str] = Header(None)):
+    """Current profiling settings of the worker that served this request."""
+    check_admin(x_admin_token)
+    refresh_settings()
+    return profiling_status()
+
+@router.post("/profiling")
+def update_profiling(update: ProfilingUpdate, x_admin_token: Optional[str] = Header(None)):
+    """Toggle request sampling and cProfile capture at runtime (every worker picks it up within a second)."""
+    check_admin(x_admin_token)
+
+    if update.sample_rate is not None and not 0 <= update.sample_rate <= 1:
+        raise HTTPException(status_code=400, detail="sample_rate must be between 0 and 1")
+
+    save_settings(update.dict(exclude_none=True))
+    return profiling_status()
@@ -1,14 +1,44 @@
-from fastapi import APIRouter, UploadFile, HTTPException, Depends
+from fastapi import APIRouter, UploadFile, HTTPException, Depends, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.services.voice_service import extract_embedding
-from app.db.database import get_db
+from app.services.voice_service import extract_embedding, embed_window, extract_segment_embeddings
+from app.services.cohort_service import cohort_enabled, cohort_stats, current_stats, as_norm
+from app.services.enrollment_service import store_embedding
+from app.services.job_queue import job_queue
+from app.services.profiling import span
+from app.services.gallery_service import gallery
+from app.services.segment_service import audio_id_for, get_segments, put_segments, score_segments
+from app.services.stream_service import StreamingVerifier, STREAM_SAMPLE_RATE, MAX_FRAME_BYTES, \
+    try_acquire_stream, release_stream
+from app.db.database import get_db, AsyncSessionLocal
 from app.db.models import VoiceEmbedding
 import numpy as np
-from app.services.encryption_service import encrypt_embedding, decrypt_embedding
+import os
+from app.services.encryption_service import decrypt_embedding
 
 router = APIRouter()
 
+# Decision threshold on the AS-norm score, used instead of the raw 0.85 cosine when a cohort is loaded
+ASNORM_THRESHOLD = float(os.getenv("ASNORM_THRESHOLD", "3.0"))
+
+async def load_enrolled(user_id: str, db: AsyncSession):
+    """Return (embedding, enroll cohort stats) for a user, decrypting once and caching in the gallery."""
+    cached = gallery.get(user_id)
+    if cached is not None:
+        return cached
+
+    with span("db.select_voice_embedding"):
+        result = await db.execute(select(VoiceEmbedding).filter(VoiceEmbedding.user_id == user_id))
+    record = result.scalars().first()
+    if not record:
+        return None
+
+    stored_embedding = np.array(decrypt_embedding(record.embedding))
+    enroll_stats = current_stats(record.cohort_mean, record.cohort_std, record.cohort_id)
+    gallery.put(user_id, stored_embedding, enroll_stats)
+    return stored_embedding, enroll_stats
+
 # ---- ENROLL ----
 @router.post("/enroll/{user_id}")
 async def enroll_voice(user_id: str, file: UploadFile, db: AsyncSession = Depends(get_db)):
@@ -18,32 +48,39 @@ async def enroll_voice(user_id: str, file: UploadFile, db: AsyncSession = Depend
 
     audio_bytes = await file.read()
     embedding = extract_embedding(audio_bytes)
-    encrypted = encrypt_embedding(embedding.tolist())  # Always encrypt before saving
+    await store_embedding(db, user_id, embedding)
+    return {"message": f"Voice enrolled successfully for user: {user_id}"}
 
-    # Query async
-    result = await db.execute(select(VoiceEmbedding).filter(VoiceEmbedding.user_id == user_id))
-    record = result.scalars().first()
+@router.post("/enroll/{user_id}/async", status_code=202)
+async def enroll_voice_async(user_id: str, file: UploadFile):
+    """Queue an enrollment and return a job ID immediately; poll /auth/jobs/{job_id} for the result."""
+    if not file.filename.endswith(".wav"):
+        raise HTTPException(status_code=400, detail="Only .wav files are supported.")
 
-    if record:
-        record.embedding = encrypted
-    else:
-        record = VoiceEmbedding(user_id=user_id, embedding=encrypted)
-        db.add(record)
+    audio_bytes = await file.read()
+    job_id = await job_queue.enqueue(user_id, audio_bytes)
+    return {"job_id": job_id, "status": "queued"}
 
-    await db.commit()
-    return {"message": f"Voice enrolled successfully for user: {user_id}"}
+@router.get("/jobs/{job_id}")
+async def enrollment_job_status(job_id: str):
+    """Status of an async enrollment job: queued, processing, done or failed."""
+    job = await job_queue.status(job_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job
 
 # ---- VERIFY ----
 @router.post("/verify/{user_id}")
 async def verify_voice(user_id: str, file: UploadFile, db: AsyncSession = Depends(get_db)):
     """Verify speaker identity using PostgreSQL encrypted embeddings (async)."""
-    result = await db.execute(select(VoiceEmbedding).filter(VoiceEmbedding.user_id == user_id))
-    record = result.scalars().first()
+    enrolled = await load_enrolled(user_id, db)
 
-    if not record:
+    if not enrolled:
         raise HTTPException(status_code=404, detail="User not enrolled")
 
-    stored_embedding = np.array(decrypt_embedding(record.embedding))
+    stored_embedding, enroll_stats = enrolled
 
     if not file.filename.endswith(".wav"):
         raise HTTPException(status_code=400, detail="Only .wav files are supported.")
@@ -54,9 +91,104 @@ async def verify_voice(user_id: str, file: UploadFile, db: AsyncSession = Depend
     similarity = np.dot(new_embedding, stored_embedding) / (
         np.linalg.norm(new_embedding) * np.linalg.norm(stored_embedding)
     )
-    verified = bool(similarity > 0.85)
+
+    if not cohort_enabled():
+        return {
+            "verified": bool(similarity > 0.85),
+            "voice_similarity": round(float(similarity), 3)
+        }
+
+    # Users enrolled before this cohort was built have no matching stats; compute them on the fly
+    if enroll_stats is None:
+        enroll_stats = cohort_stats(stored_embedding)
+    normalized = as_norm(float(similarity), enroll_stats, cohort_stats(new_embedding))
 
     return {
-        "verified": verified,
-        "voice_similarity": round(float(similarity), 3)
+        "verified": bool(normalized > ASNORM_THRESHOLD),
+        "voice_similarity": round(float(similarity), 3),
+        "normalized_score": round(float(normalized), 3)
     }
+
+# ---- SEGMENT SCORING ----
+@router.post("/segments/{user_id}")
+async def score_recording_segments(user_id: str, file: UploadFile, db: AsyncSession = Depends(get_db)):
+    """Score each window of a long recording against a user and report the matching time ranges."""
+    enrolled = await load_enrolled(user_id, db)
+
+    if not enrolled:
+        raise HTTPException(status_code=404, detail="User not enrolled")
+
+    if not file.filename.endswith(".wav"):
+        raise HTTPException(status_code=400, detail="Only .wav files are supported.")
+
+    audio_bytes = await file.read()
+    audio_id = audio_id_for(audio_bytes)
+    cached = get_segments(audio_id)
+    if cached is None:
+        cached = await run_in_threadpool(extract_segment_embeddings, audio_bytes)
+        put_segments(audio_id, *cached)
+
+    return {"audio_id": audio_id, "user_id": user_id, **score_segments(*cached, enrolled[0])}
+
+@router.get("/segments/{audio_id}/score/{user_id}")
+async def rescore_recording_segments(audio_id: str, user_id: str, db: AsyncSession = Depends(get_db)):
+    """Re-score a previously uploaded recording against another user without running inference."""
+    cached = get_segments(audio_id)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Recording not cached, upload it again")
+
+    enrolled = await load_enrolled(user_id, db)
+
+    if not enrolled:
+        raise HTTPException(status_code=404, detail="User not enrolled")
+
+    return {"audio_id": audio_id, "user_id": user_id, **score_segments(*cached, enrolled[0])}
+
+# ---- STREAMING VERIFY ----
+@router.websocket("/stream/{user_id}")
+async def stream_verify(websocket: WebSocket, user_id: str):
+    """Continuously verify a speaker from 16 kHz 16-bit mono PCM frames sent as binary messages."""
+    if not try_acquire_stream():
+        # Closing before accept() is sent as an HTTP 403, so accept first to deliver the 1013
+        await websocket.accept()
+        await websocket.close(code=1013, reason="Too many concurrent streams")
+        return
+
+    try:
+        # Short-lived session: don't hold a pooled connection for the whole stream
+        async with AsyncSessionLocal() as db:
+            enrolled = await load_enrolled(user_id, db)
+        await websocket.accept()
+        if not enrolled:
+            await websocket.close(code=1008, reason="User not enrolled")
+            return
+
+        verifier = StreamingVerifier(enrolled[0])
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes") is None:
+                await websocket.close(code=1003, reason="Only binary PCM frames are accepted")
+                break
+            if len(message["bytes"]) > MAX_FRAME_BYTES:
+                await websocket.close(code=1009, reason="Frame too large")
+                break
+
+            windows = verifier.feed(message["bytes"])
+            if not windows:
+                continue
+
+            for window in windows:
+                verifier.add_partial(await run_in_threadpool(embed_window, window))
+            similarity, decision = verifier.score()
+            await websocket.send_json({
+                "decision": decision,
+                "voice_similarity": None if similarity is None else round(similarity, 3),
+                "windows": len(verifier.partials),
+                "seconds": round(verifier.samples_seen / STREAM_SAMPLE_RATE, 2)
+            })
+    except WebSocketDisconnect:
+        pass
+    finally:
+        release_stream()
@@ -0,0 +1,57 @@
+# app/services/cohort_service.py
+import hashlib
+import numpy as np
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Cohort of impostor embeddings used for adaptive symmetric score normalization (AS-norm).
+# Build it once with db_scripts/build_cohort.py; verification works without it (raw cosine only).
+COHORT_PATH = os.getenv("COHORT_PATH")
+COHORT_TOP_K = int(os.getenv("COHORT_TOP_K", "200"))
+
+def load_cohort(path):
+    """Load cohort embeddings as a compact, row-normalized float32 matrix (or None)."""
+    if not path or not os.path.exists(path):
+        return None
+    matrix = np.load(path).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.ascontiguousarray(matrix)
+
+def cohort_fingerprint(path, top_k):
+    """Identifies the cohort file and top-k that stored enroll-side stats were computed against."""
+    if not path or not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    digest.update(f":top_k={top_k}".encode())
+    return digest.hexdigest()
+
+cohort = load_cohort(COHORT_PATH)
+cohort_id = cohort_fingerprint(COHORT_PATH, COHORT_TOP_K)
+
+def cohort_enabled():
+    return cohort is not None and len(cohort) > 0
+
+def current_stats(cohort_mean, cohort_std, stats_cohort_id):
+    """Stored enroll-side stats if they were computed against the loaded cohort, else None."""
+    if cohort_mean is None or cohort_std is None or stats_cohort_id != cohort_id:
+        return None
+    return cohort_mean, cohort_std
+
+def cohort_stats(embedding):
+    """Mean/std of the top-k cohort scores for one embedding (a single matrix-vector product)."""
+    embedding = np.asarray(embedding, dtype=np.float32)
+    scores = cohort @ (embedding / np.linalg.norm(embedding))
+    k = min(COHORT_TOP_K, len(scores))
+    top = np.partition(scores, len(scores) - k)[-k:]
+    return float(top.mean()), float(max(top.std(), 1e-6))
+
+def as_norm(score, enroll_stats, test_stats):
+    """Symmetric normalization of a raw cosine score using enroll-side and test-side cohort stats."""
+    enroll_mean, enroll_std = enroll_stats
+    test_mean, test_std = test_stats
+    return 0.5 * ((score - enroll_mean) / enroll_std + (score - test_mean) / test_std)
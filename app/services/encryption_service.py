@@ -1,6 +1,7 @@
 from cryptography.fernet import Fernet
 import os
 from dotenv import load_dotenv
+from app.services.profiling import traced
 
 load_dotenv()
 #ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY", Fernet.generate_key())  # Store securely
@@ -9,11 +10,13 @@ load_dotenv()
 FERNET_KEY = os.getenv("FERNET_KEY")
 cipher = Fernet(FERNET_KEY)
 
+@traced("crypto.encrypt_embedding")
 def encrypt_embedding(embedding):
     import numpy as np
     data = ",".join(map(str, embedding))  # convert array to string
     return cipher.encrypt(data.encode()).decode()
 
+@traced("crypto.decrypt_embedding")
 def decrypt_embedding(encrypted_str):
     decrypted = cipher.decrypt(encrypted_str.encode()).decode()
     return [float(x) for x in decrypted.split(",")]
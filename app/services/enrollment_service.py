@@ -0,0 +1,107 @@
+# app/services/enrollment_service.py
+import asyncio
+import os
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.db.database import AsyncSessionLocal
+from app.db.models import VoiceEmbedding
+from app.services.cohort_service import cohort_enabled, cohort_stats, cohort_id
+from app.services.encryption_service import encrypt_embedding
+from app.services.gallery_service import gallery
+from app.services.job_queue import job_queue
+from app.services.profiling import span
+from app.services.voice_service import extract_embeddings_batch
+
+ENROLL_WORKERS = int(os.getenv("ENROLL_WORKERS", "1"))
+ENROLL_BATCH_SIZE = int(os.getenv("ENROLL_BATCH_SIZE", "16"))
+ENROLL_POLL_SECONDS = float(os.getenv("ENROLL_POLL_SECONDS", "0.5"))
+
+async def store_embedding(db: AsyncSession, user_id: str, embedding):
+    """Encrypt and upsert a user's embedding with its AS-norm cohort stats, then refresh the gallery."""
+    encrypted = encrypt_embedding(embedding.tolist())  # Always encrypt before saving
+    cohort_mean, cohort_std = cohort_stats(embedding) if cohort_enabled() else (None, None)
+    stats_cohort_id = cohort_id if cohort_enabled() else None
+
+    # Query async
+    with span("db.select_voice_embedding"):
+        result = await db.execute(select(VoiceEmbedding).filter(VoiceEmbedding.user_id == user_id))
+    record = result.scalars().first()
+
+    if record:
+        record.embedding = encrypted
+        record.cohort_mean = cohort_mean
+        record.cohort_std = cohort_std
+        record.cohort_id = stats_cohort_id
+    else:
+        record = VoiceEmbedding(user_id=user_id, embedding=encrypted, cohort_mean=cohort_mean,
+                                cohort_std=cohort_std, cohort_id=stats_cohort_id)
+        db.add(record)
+
+    # The invalidation is part of the transaction, so other workers hear about it exactly when it commits
+    await gallery.publish_invalidation(db, user_id)
+    with span("db.commit"):
+        await db.commit()
+    gallery.put(user_id, embedding, None if cohort_mean is None else (cohort_mean, cohort_std))
+
+class EnrollmentWorkerPool:
+    """Background workers that drain the enrollment job queue, batching inference across jobs."""
+
+    def __init__(self, queue, workers: int = ENROLL_WORKERS, batch_size: int = ENROLL_BATCH_SIZE,
+                 poll_seconds: float = ENROLL_POLL_SECONDS):
+        self.queue = queue
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.tasks = []
+
+    async def start(self):
+        self.tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    async def _run(self):
+        while True:
+            try:
+                jobs = await self.queue.claim_batch(self.batch_size)
+                if not jobs:
+                    await asyncio.sleep(self.poll_seconds)
+                    continue
+                await self.process_batch(jobs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Enrollment worker error: {e}")
+                await asyncio.sleep(self.poll_seconds)
+
+    async def process_batch(self, jobs):
+        """Embed and store a claimed batch; every job ends up done or failed."""
+        try:
+            embeddings = await run_in_threadpool(extract_embeddings_batch, [audio for _, _, audio in jobs])
+        except Exception as e:
+            # The shared forward pass failed (backend error, out of memory): no job in the batch has a result
+            for job_id, _, _ in jobs:
+                await self.queue.fail(job_id, f"Inference failed: {e}")
+            return
+
+        async with AsyncSessionLocal() as db:
+            for (job_id, user_id, _), embedding in zip(jobs, embeddings):
+                if isinstance(embedding, Exception):
+                    await self.queue.fail(job_id, f"Audio processing failed: {embedding}")
+                    continue
+                try:
+                    await store_embedding(db, user_id, embedding)
+                except Exception as e:
+                    await self.queue.fail(job_id, f"Storing embedding failed: {e}")
+                    try:
+                        await db.rollback()
+                    except Exception as rollback_error:
+                        print(f"Enrollment rollback failed: {rollback_error}")
+                    continue
+                await self.queue.complete(job_id)
+
+enrollment_pool = EnrollmentWorkerPool(job_queue)
@@ -0,0 +1,140 @@
+# app/services/gallery_service.py
+import asyncio
+import os
+import time
+import uuid
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+load_dotenv()
+
+DATABASE_URL = os.getenv("DATABASE_URL", "")
+GALLERY_CHANNEL = "voice_embeddings_changed"
+# Upper bound on staleness even if an invalidation message is lost (e.g. while a listener reconnects)
+GALLERY_TTL_SECONDS = float(os.getenv("GALLERY_TTL_SECONDS", "60"))
+
+WORKER_ID = uuid.uuid4().hex  # Lets a worker ignore the notifications it published itself
+
+class LocalInvalidationBus:
+    """In-process bus: every gallery in this process hears every publish (single worker and tests)."""
+
+    def __init__(self):
+        self.subscribers = []
+
+    async def start(self, on_invalidate):
+        self.subscribers.append(on_invalidate)
+
+    async def stop(self):
+        self.subscribers.clear()
+
+    async def publish(self, db, user_id: str):
+        # Same process, so no transaction to ride on; the enrolling gallery re-caches after commit
+        for on_invalidate in self.subscribers:
+            on_invalidate(user_id)
+
+class PostgresInvalidationBus:
+    """Cluster-wide bus over Postgres LISTEN/NOTIFY on the voice_embeddings_changed channel."""
+
+    def __init__(self, dsn: str, reconnect_delay: float = 1.0):
+        self.dsn = dsn.replace("+asyncpg", "")  # asyncpg uses normal DSN
+        self.reconnect_delay = reconnect_delay
+        self.listen_task = None
+
+    async def start(self, on_invalidate):
+        self.listen_task = asyncio.create_task(self._listen(on_invalidate))
+
+    async def stop(self):
+        if self.listen_task:
+            self.listen_task.cancel()
+
+    async def _listen(self, on_invalidate):
+        import asyncpg
+
+        def handle(conn, pid, channel, payload):
+            origin, _, user_id = payload.partition(":")
+            if origin != WORKER_ID:
+                on_invalidate(user_id)
+
+        while True:
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                conn.add_termination_listener(lambda c: closed.set())
+                await conn.add_listener(GALLERY_CHANNEL, handle)
+                # Anything published while we were disconnected was missed: start cold
+                on_invalidate(None)
+                await closed.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Gallery listener error, reconnecting: {e}")
+            on_invalidate(None)
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def publish(self, db, user_id: str):
+        """Queue the notification in the caller's transaction; Postgres delivers it only on commit."""
+        await db.execute(text("SELECT pg_notify(:channel, :payload)"),
+                         {"channel": GALLERY_CHANNEL, "payload": f"{WORKER_ID}:{user_id}"})
+
+class EmbeddingGallery:
+    """Per-worker cache of decrypted enrolled embeddings, kept coherent through an invalidation bus."""
+
+    def __init__(self, bus, ttl: float = GALLERY_TTL_SECONDS):
+        self.bus = bus
+        self.ttl = ttl
+        self.entries = {}  # user_id -> (loaded_at, embedding, enroll cohort stats or None)
+        self.snapshot = None  # Cold tier: mmapped snapshot used before falling back to the database
+        self.snapshot_stale = set()  # Users changed since the snapshot was exported
+
+    async def start(self):
+        await self.bus.start(self.invalidate)
+
+    async def stop(self):
+        await self.bus.stop()
+
+    def attach_snapshot(self, snapshot):
+        self.snapshot = snapshot
+        self.snapshot_stale = set()
+
+    def get(self, user_id: str):
+        entry = self.entries.get(user_id)
+        if entry is not None:
+            loaded_at, embedding, enroll_stats = entry
+            if time.monotonic() - loaded_at <= self.ttl:
+                return embedding, enroll_stats
+            # Expired entries are reloaded from the database, never from the older snapshot
+            del self.entries[user_id]
+            self.snapshot_stale.add(user_id)
+            return None
+
+        if self.snapshot is None or user_id in self.snapshot_stale:
+            return None
+        cold = self.snapshot.get(user_id)
+        if cold is None:
+            return None
+        embedding, enroll_stats = cold[0].astype(np.float64), cold[1]
+        self.put(user_id, embedding, enroll_stats)
+        return embedding, enroll_stats
+
+    def put(self, user_id: str, embedding, enroll_stats=None):
+        self.entries[user_id] = (time.monotonic(), embedding, enroll_stats)
+
+    def invalidate(self, user_id=None):
+        """Drop one user, or everything when user_id is None."""
+        if user_id is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(user_id, None)
+            self.snapshot_stale.add(user_id)
+
+    async def publish_invalidation(self, db, user_id: str):
+        """Tell every other worker to drop its copy of a user; call before committing the write in db."""
+        await self.bus.publish(db, user_id)
+
+def create_bus():
+    if DATABASE_URL.startswith("postgresql"):
+        return PostgresInvalidationBus(DATABASE_URL)
+    return LocalInvalidationBus()
+
+gallery = EmbeddingGallery(create_bus())
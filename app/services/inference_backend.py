@@ -0,0 +1,82 @@
+# app/services/inference_backend.py
+from resemblyzer import VoiceEncoder
+from resemblyzer.hparams import partials_n_frames, mel_n_channels
+import numpy as np
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# torch (resemblyzer LSTM), onnx (exported fp32 model) or onnx-int8 (dynamically quantized model)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")
+# Threads per worker; set to cores / uvicorn workers to avoid oversubscription (0 = library default)
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", "0"))
+ONNX_MODEL_PATH = os.getenv("ONNX_MODEL_PATH", "voice_encoder.onnx")
+ONNX_INT8_MODEL_PATH = os.getenv("ONNX_INT8_MODEL_PATH", "voice_encoder.int8.onnx")
+
+class TorchBackend:
+    """The resemblyzer PyTorch LSTM."""
+
+    name = "torch"
+
+    def __init__(self, threads: int = INFERENCE_THREADS):
+        import torch
+
+        if threads:
+            torch.set_num_threads(threads)
+            try:
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                pass  # Can only be set once per process, before any parallel work
+        self.torch = torch
+        self.encoder = VoiceEncoder(verbose=False)
+
+    def embed_frames(self, mels: np.ndarray):
+        """L2-normed embeddings for a (batch, frames, mel channels) float32 array."""
+        with self.torch.no_grad():
+            return self.encoder(self.torch.from_numpy(mels).to(self.encoder.device)).cpu().numpy()
+
+class OnnxBackend:
+    """The same network exported to ONNX (see export_onnx_model.py), run with ONNX Runtime."""
+
+    def __init__(self, model_path: str, threads: int = INFERENCE_THREADS, name: str = "onnx"):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.inter_op_num_threads = 1
+        if threads:
+            options.intra_op_num_threads = threads
+        self.name = name
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+
+    def embed_frames(self, mels: np.ndarray):
+        """L2-normed embeddings for a (batch, frames, mel channels) float32 array."""
+        return self.session.run(None, {"mels": mels.astype(np.float32, copy=False)})[0]
+
+def create_backend(name: str = INFERENCE_BACKEND, threads: int = INFERENCE_THREADS):
+    if name == "torch":
+        return TorchBackend(threads)
+    if name == "onnx":
+        return OnnxBackend(ONNX_MODEL_PATH, threads)
+    if name == "onnx-int8":
+        return OnnxBackend(ONNX_INT8_MODEL_PATH, threads, name="onnx-int8")
+    raise ValueError(f"Unknown INFERENCE_BACKEND: {name}")
+
+def export_onnx(model_path: str = ONNX_MODEL_PATH, int8_model_path: str = None):
+    """Export the resemblyzer encoder to ONNX, optionally with a dynamically quantized int8 copy."""
+    import torch
+
+    encoder = VoiceEncoder(device="cpu", verbose=False).eval()
+    dummy = torch.zeros(1, partials_n_frames, mel_n_channels)
+    torch.onnx.export(
+        encoder, dummy, model_path,
+        input_names=["mels"], output_names=["embeds"],
+        dynamic_axes={"mels": {0: "batch", 1: "frames"}, "embeds": {0: "batch"}},
+        opset_version=14
+    )
+
+    if int8_model_path:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(model_path, int8_model_path, weight_type=QuantType.QInt8)
@@ -0,0 +1,119 @@
+# app/services/job_queue.py
+import asyncio
+import os
+import sqlite3
+import time
+import uuid
+from dotenv import load_dotenv
+
+load_dotenv()
+
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "enrollment_jobs.db")
+# A claim older than this is assumed to belong to a worker that died, and the job is claimed again
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "600"))
+# A job whose claim expired this many times (e.g. it crashes the worker every time) is marked failed
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+class SQLiteJobQueue:
+    """Local enrollment job queue backed by a SQLite file (single host, and tests).
+
+    A shared backend only needs the same async methods: enqueue, claim_batch, complete, fail, status.
+    """
+
+    def __init__(self, path: str = JOB_QUEUE_PATH, lease_seconds: float = JOB_LEASE_SECONDS,
+                 max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS enrollment_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    audio BLOB,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            # Queue files created before attempts were counted
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(enrollment_jobs)")]
+            if "attempts" not in columns:
+                conn.execute("ALTER TABLE enrollment_jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_enrollment_jobs_status ON enrollment_jobs (status, created_at)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _enqueue(self, user_id, audio_bytes):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO enrollment_jobs (job_id, user_id, status, audio, created_at, updated_at) "
+                "VALUES (?, ?, 'queued', ?, ?, ?)",
+                (job_id, user_id, audio_bytes, now, now)
+            )
+        return job_id
+
+    def _claim_batch(self, limit):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")  # Serialize claims across worker processes
+            now = time.time()
+            expired = now - self.lease_seconds
+            conn.execute(
+                "UPDATE enrollment_jobs SET status = 'failed', error = ?, audio = NULL, updated_at = ? "
+                "WHERE status = 'processing' AND updated_at < ? AND attempts >= ?",
+                (f"Gave up after {self.max_attempts} attempts", now, expired, self.max_attempts)
+            )
+            # Queued jobs, plus jobs whose claim has outlived its lease
+            rows = conn.execute(
+                "SELECT job_id, user_id, audio FROM enrollment_jobs "
+                "WHERE status = 'queued' OR (status = 'processing' AND updated_at < ?) "
+                "ORDER BY created_at LIMIT ?", (expired, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE enrollment_jobs SET status = 'processing', attempts = attempts + 1, updated_at = ? "
+                "WHERE job_id = ?",
+                [(now, row[0]) for row in rows]
+            )
+            conn.execute("COMMIT")
+        return rows
+
+    def _finish(self, job_id, status, error):
+        with self._connect() as conn:
+            # Audio is only needed until the embedding is stored
+            conn.execute(
+                "UPDATE enrollment_jobs SET status = ?, error = ?, audio = NULL, updated_at = ? WHERE job_id = ?",
+                (status, error, time.time(), job_id)
+            )
+
+    def _status(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT job_id, user_id, status, error, created_at, updated_at FROM enrollment_jobs WHERE job_id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("job_id", "user_id", "status", "error", "created_at", "updated_at"), row))
+
+    async def enqueue(self, user_id: str, audio_bytes: bytes):
+        return await asyncio.to_thread(self._enqueue, user_id, audio_bytes)
+
+    async def claim_batch(self, limit: int):
+        """Atomically claim up to `limit` queued (or lease-expired) jobs and return (job_id, user_id, audio)."""
+        return await asyncio.to_thread(self._claim_batch, limit)
+
+    async def complete(self, job_id: str):
+        await asyncio.to_thread(self._finish, job_id, "done", None)
+
+    async def fail(self, job_id: str, error: str):
+        await asyncio.to_thread(self._finish, job_id, "failed", error)
+
+    async def status(self, job_id: str):
+        return await asyncio.to_thread(self._status, job_id)
+
+job_queue = SQLiteJobQueue()
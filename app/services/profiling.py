@@ -0,0 +1,165 @@
+# app/services/profiling.py
+import contextvars
+import cProfile
+import functools
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Opt-in settings; the /admin/profiling endpoint changes them at runtime through PROFILE_SETTINGS_PATH
+settings = {
+    "enabled": os.getenv("PROFILE_ENABLED", "false").lower() == "true",
+    "sample_rate": float(os.getenv("PROFILE_SAMPLE_RATE", "0.01")),  # fraction of /auth requests traced
+    "cprofile": os.getenv("PROFILE_CPROFILE", "false").lower() == "true",  # also dump .prof files
+}
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "traces.jsonl")
+PROFILE_OUTPUT_DIR = os.getenv("PROFILE_OUTPUT_DIR", "profiles")
+# Runtime overrides shared by every worker on the host; each worker re-reads it when it changes
+PROFILE_SETTINGS_PATH = os.getenv("PROFILE_SETTINGS_PATH", "profiling_settings.json")
+SETTINGS_POLL_SECONDS = 1.0
+
+_settings_checked_at = 0.0
+_settings_mtime = None
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+_profiler_lock = threading.Lock()  # cProfile can only profile one request at a time
+
+def refresh_settings():
+    """Apply the shared overrides file if it changed (checked at most once per SETTINGS_POLL_SECONDS)."""
+    global _settings_checked_at, _settings_mtime
+    now = time.monotonic()
+    if now - _settings_checked_at < SETTINGS_POLL_SECONDS:
+        return
+    _settings_checked_at = now
+    try:
+        mtime = os.stat(PROFILE_SETTINGS_PATH).st_mtime_ns
+        if mtime == _settings_mtime:
+            return
+        with open(PROFILE_SETTINGS_PATH) as f:
+            overrides = json.load(f)
+    except (OSError, ValueError):
+        return  # No overrides yet, or a write in progress on a filesystem without atomic rename
+    settings.update({key: overrides[key] for key in settings if key in overrides})
+    _settings_mtime = mtime
+
+def save_settings(overrides):
+    """Apply overrides on this worker and publish them to the others through the shared file."""
+    global _settings_checked_at
+    _settings_checked_at = 0.0
+    refresh_settings()  # Don't drop a change another worker made since our last check
+    settings.update(overrides)
+    tmp_path = f"{PROFILE_SETTINGS_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(settings, f)
+    os.replace(tmp_path, PROFILE_SETTINGS_PATH)
+
+class Trace:
+    """Spans recorded for one sampled request."""
+
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex
+        self.start = time.perf_counter()
+        self.spans = []
+        self.stack = []
+
+    def to_dict(self, **fields):
+        return {
+            "trace_id": self.trace_id,
+            **fields,
+            "duration_ms": round((time.perf_counter() - self.start) * 1000, 3),
+            "spans": self.spans
+        }
+
+@contextmanager
+def span(name: str):
+    """Time a block as a span of the current trace; a no-op when the request is not sampled."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+
+    parent = trace.stack[-1] if trace.stack else None
+    trace.stack.append(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.stack.pop()
+        trace.spans.append({
+            "name": name,
+            "parent": parent,
+            "start_ms": round((start - trace.start) * 1000, 3),
+            "duration_ms": round((time.perf_counter() - start) * 1000, 3)
+        })
+
+def traced(name: str):
+    """Decorator recording every call of a sync function as a span."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class LocalFileExporter:
+    """Appends one JSON line per finished trace."""
+
+    def __init__(self, path: str = TRACE_EXPORT_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def export(self, trace_dict):
+        line = json.dumps(trace_dict)
+        with self.lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+
+class ProfilingMiddleware:
+    """ASGI middleware that traces (and optionally cProfiles) a sampled fraction of /auth requests."""
+
+    def __init__(self, app, exporter=None):
+        self.app = app
+        self.exporter = exporter or LocalFileExporter()
+
+    async def __call__(self, scope, receive, send):
+        refresh_settings()
+        if (scope["type"] != "http" or not settings["enabled"] or not scope["path"].startswith("/auth/")
+                or random.random() >= settings["sample_rate"]):
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace()
+        token = _current_trace.set(trace)
+        status = {}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        profiler = None
+        if settings["cprofile"] and _profiler_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+            profiler.enable()
+        try:
+            with span("request"):
+                await self.app(scope, receive, send_with_status)
+        finally:
+            profile_path = None
+            if profiler:
+                profiler.disable()
+                _profiler_lock.release()
+                os.makedirs(PROFILE_OUTPUT_DIR, exist_ok=True)
+                profile_path = os.path.join(PROFILE_OUTPUT_DIR, f"{trace.trace_id}.prof")
+                profiler.dump_stats(profile_path)
+            _current_trace.reset(token)
+            self.exporter.export(trace.to_dict(
+                method=scope["method"], path=scope["path"], status=status.get("code"), profile=profile_path
+            ))
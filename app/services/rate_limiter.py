@@ -0,0 +1,161 @@
+# app/services/rate_limiter.py
+import math
+import os
+import time
+from fastapi.responses import JSONResponse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Token buckets: sustained requests per second and burst size, per client and per user_id
+CLIENT_RATE = float(os.getenv("RATE_LIMIT_CLIENT_RPS", "5"))
+CLIENT_BURST = float(os.getenv("RATE_LIMIT_CLIENT_BURST", "20"))
+USER_RATE = float(os.getenv("RATE_LIMIT_USER_RPS", "1"))
+USER_BURST = float(os.getenv("RATE_LIMIT_USER_BURST", "5"))
+# Clients are keyed on the peer address. Only set this to a header your proxy or gateway sets itself
+# (callers can put anything in headers that are passed through).
+CLIENT_HEADER = os.getenv("RATE_LIMIT_CLIENT_HEADER", "").lower()
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory | redis
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Per-worker inference admission: concurrent forward passes and seconds of audio in flight
+MAX_INFERENCE_CONCURRENCY = int(os.getenv("MAX_INFERENCE_CONCURRENCY", "4"))
+MAX_INFERENCE_AUDIO_SECONDS = float(os.getenv("MAX_INFERENCE_AUDIO_SECONDS", "120"))
+# Used to estimate audio length from Content-Length before the upload is read (16-bit mono 44.1 kHz)
+AUDIO_BYTES_PER_SECOND = int(os.getenv("AUDIO_BYTES_PER_SECOND", "88200"))
+
+# Rate-limited POST routes under /auth; all run a forward pass in the request except async enrollment
+LIMITED_ROUTES = {"enroll", "verify", "segments"}
+
+class InMemoryRateLimitBackend:
+    """Token buckets held by this worker only."""
+
+    def __init__(self, prune_interval: float = 10.0, clock=time.monotonic):
+        self.buckets = {}  # key -> (tokens, last refill time, time the bucket is full again)
+        self.prune_interval = prune_interval
+        self.clock = clock
+        self.next_prune = clock() + prune_interval
+
+    def _prune(self, now: float):
+        # Buckets that have refilled are equivalent to new ones
+        self.buckets = {k: v for k, v in self.buckets.items() if v[2] > now}
+        self.next_prune = now + self.prune_interval
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1.0):
+        """Take `cost` tokens; returns (allowed, seconds until enough tokens are available)."""
+        now = self.clock()
+        if now >= self.next_prune:
+            self._prune(now)
+        tokens, last, _ = self.buckets.get(key, (burst, now, now))
+        tokens = min(burst, tokens + (now - last) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self.buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+class RedisRateLimitBackend:
+    """Token buckets shared by every worker and host through Redis (atomic Lua script)."""
+
+    SCRIPT = """
+    local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens') or ARGV[2])
+    local last = tonumber(redis.call('HGET', KEYS[1], 'last') or ARGV[4])
+    tokens = math.min(tonumber(ARGV[2]), tokens + (tonumber(ARGV[4]) - last) * tonumber(ARGV[1]))
+    local allowed = 0
+    if tokens >= tonumber(ARGV[3]) then
+        tokens = tokens - tonumber(ARGV[3])
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'last', ARGV[4])
+    redis.call('EXPIRE', KEYS[1], math.ceil(tonumber(ARGV[2]) / tonumber(ARGV[1])) + 1)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url: str = REDIS_URL):
+        import redis.asyncio as redis
+
+        self.redis = redis.from_url(url)
+        self.script = self.redis.register_script(self.SCRIPT)
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1.0):
+        allowed, tokens = await self.script(keys=[f"ratelimit:{key}"], args=[rate, burst, cost, time.time()])
+        if allowed:
+            return True, 0.0
+        return False, (cost - float(tokens)) / rate
+
+class InferenceBudget:
+    """Non-blocking admission for forward passes, bounded by count and by seconds of audio."""
+
+    def __init__(self, max_concurrency: int = MAX_INFERENCE_CONCURRENCY,
+                 max_audio_seconds: float = MAX_INFERENCE_AUDIO_SECONDS):
+        self.max_concurrency = max_concurrency
+        self.max_audio_seconds = max_audio_seconds
+        self.active = 0
+        self.audio_seconds = 0.0
+
+    def try_acquire(self, audio_seconds: float):
+        if self.active >= self.max_concurrency:
+            return False
+        # A single upload longer than the whole budget is still admitted when nothing else runs
+        if self.active and self.audio_seconds + audio_seconds > self.max_audio_seconds:
+            return False
+        self.active += 1
+        self.audio_seconds += audio_seconds
+        return True
+
+    def release(self, audio_seconds: float):
+        self.active -= 1
+        self.audio_seconds -= audio_seconds
+
+def create_backend(name: str = RATE_LIMIT_BACKEND):
+    if name == "memory":
+        return InMemoryRateLimitBackend()
+    if name == "redis":
+        return RedisRateLimitBackend()
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {name}")
+
+def _too_many_requests(detail: str, retry_after: float):
+    return JSONResponse(status_code=429, content={"detail": detail},
+                        headers={"Retry-After": str(max(1, math.ceil(retry_after)))})
+
+class RateLimitMiddleware:
+    """ASGI middleware that admits or rejects inference requests from headers alone, before the upload is read."""
+
+    def __init__(self, app, backend=None, budget=None):
+        self.app = app
+        self.backend = backend or create_backend()
+        self.budget = budget or InferenceBudget()
+
+    async def __call__(self, scope, receive, send):
+        # /auth/{route}/{user_id}[/...]
+        parts = scope["path"].strip("/").split("/") if scope["type"] == "http" else []
+        if len(parts) < 3 or parts[0] != "auth" or parts[1] not in LIMITED_ROUTES or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k.decode().lower(): v.decode() for k, v in scope["headers"]}
+        client = (CLIENT_HEADER and headers.get(CLIENT_HEADER)) or (scope.get("client") or ("unknown",))[0]
+        user_id = parts[2]
+
+        allowed, retry_after = await self.backend.take(f"client:{client}", CLIENT_RATE, CLIENT_BURST)
+        if not allowed:
+            await _too_many_requests("Rate limit exceeded for client", retry_after)(scope, receive, send)
+            return
+        allowed, retry_after = await self.backend.take(f"user:{user_id}", USER_RATE, USER_BURST)
+        if not allowed:
+            await _too_many_requests("Rate limit exceeded for user", retry_after)(scope, receive, send)
+            return
+
+        # POST /auth/enroll/{user_id}/async is queued for the enrollment workers, no inference here
+        if len(parts) == 4 and parts[1] == "enroll" and parts[3] == "async":
+            await self.app(scope, receive, send)
+            return
+
+        audio_seconds = int(headers.get("content-length", "0") or 0) / AUDIO_BYTES_PER_SECOND
+        if not self.budget.try_acquire(audio_seconds):
+            await _too_many_requests("Inference capacity exhausted, retry shortly", 1)(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.budget.release(audio_seconds)
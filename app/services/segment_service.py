@@ -0,0 +1,57 @@
+# app/services/segment_service.py
+from collections import OrderedDict
+import hashlib
+import numpy as np
+import os
+
+# Per-window embeddings are cached by audio digest so re-scoring a recording against another
+# user costs no inference. Oldest recordings are evicted first.
+SEGMENT_CACHE_SIZE = int(os.getenv("SEGMENT_CACHE_SIZE", "64"))
+SEGMENT_THRESHOLD = float(os.getenv("SEGMENT_THRESHOLD", "0.8"))
+
+segment_cache = OrderedDict()  # audio_id -> (partial embeddings, [(start, end), ...])
+
+def audio_id_for(audio_bytes: bytes):
+    return hashlib.sha256(audio_bytes).hexdigest()
+
+def get_segments(audio_id: str):
+    """Cached (partial embeddings, ranges) for a recording, or None if it was never seen or evicted."""
+    if audio_id not in segment_cache:
+        return None
+    segment_cache.move_to_end(audio_id)
+    return segment_cache[audio_id]
+
+def put_segments(audio_id: str, partial_embeds, ranges):
+    segment_cache[audio_id] = (partial_embeds, ranges)
+    segment_cache.move_to_end(audio_id)
+    while len(segment_cache) > SEGMENT_CACHE_SIZE:
+        segment_cache.popitem(last=False)
+
+def score_segments(partial_embeds, ranges, enrolled_embedding, threshold=SEGMENT_THRESHOLD):
+    """Score every window against one enrolled embedding and merge matching windows into time ranges."""
+    enrolled = enrolled_embedding / np.linalg.norm(enrolled_embedding)
+    similarities = partial_embeds @ enrolled  # partials are already L2-normed
+
+    segments = []
+    matched_ranges = []
+    for (start, end), similarity in zip(ranges, similarities):
+        match = bool(similarity > threshold)
+        segments.append({
+            "start": round(start, 2),
+            "end": round(end, 2),
+            "similarity": round(float(similarity), 3),
+            "match": match
+        })
+        if not match:
+            continue
+        # Windows overlap, so consecutive matches extend the previous range
+        if matched_ranges and start <= matched_ranges[-1][1]:
+            matched_ranges[-1][1] = max(matched_ranges[-1][1], end)
+        else:
+            matched_ranges.append([start, end])
+
+    return {
+        "segments": segments,
+        "matched_ranges": [[round(s, 2), round(e, 2)] for s, e in matched_ranges],
+        "match_ratio": round(float(np.mean(similarities > threshold)), 3) if len(segments) else 0.0
+    }
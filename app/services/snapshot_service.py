@@ -0,0 +1,166 @@
+# app/services/snapshot_service.py
+import hashlib
+import os
+import struct
+import time
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.db.models import VoiceEmbedding
+from app.services.encryption_service import cipher, encrypt_embedding, decrypt_embedding
+from app.services.cohort_service import cohort_id, current_stats
+
+load_dotenv()
+
+# Snapshot loaded into the gallery at startup (optional); deltas since its export come from updated_at
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH")
+# Rows committed shortly after the export can carry an earlier updated_at; re-reading them is harmless
+DELTA_OVERLAP_SECONDS = 60
+
+# Layout (little-endian):
+#   header | user_id offsets (count + 1 x uint64) | user_id utf-8 blob | cohort stats (count x 2 float32)
+#   | matrix (count x dim, 64-byte aligned) | sha256 of everything before it
+MAGIC = b"VPSNAP01"
+ENCRYPTED_MAGIC = b"VPSNAPE1"  # Followed by a Fernet token of a plain snapshot
+VERSION = 2
+# magic, version, dtype, count, dim, reserved, snapshot_at, offsets, sha256 cohort_id of the stats (zeros if none)
+HEADER = struct.Struct("<8sIIQIIdQQQ32s")
+DTYPES = {1: np.float32, 2: np.float16}
+DTYPE_CODES = {"float32": 1, "float16": 2}
+
+def _align(offset: int, alignment: int):
+    return (offset + alignment - 1) // alignment * alignment
+
+class Snapshot:
+    """Read-only voiceprint matrix with a user_id index, viewed directly over a mmap or buffer."""
+
+    def __init__(self, buffer: np.ndarray, verify: bool = True):
+        magic, version, dtype_code, count, dim, _, snapshot_at, ids_offset, stats_offset, matrix_offset, \
+            stats_cohort_id = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a voiceprint snapshot")
+        if verify and hashlib.sha256(buffer[:-32]).digest() != bytes(buffer[-32:]):
+            raise ValueError("Snapshot checksum mismatch")
+
+        offsets = buffer[ids_offset:ids_offset + 8 * (count + 1)].view("<u8")
+        blob = bytes(buffer[ids_offset + 8 * (count + 1):stats_offset])
+        self.user_ids = [blob[offsets[i]:offsets[i + 1]].decode() for i in range(count)]
+        self.index = {user_id: i for i, user_id in enumerate(self.user_ids)}
+        self.stats = buffer[stats_offset:stats_offset + 8 * count].view("<f4").reshape(count, 2)
+        itemsize = np.dtype(DTYPES[dtype_code]).itemsize
+        self.matrix = buffer[matrix_offset:matrix_offset + itemsize * count * dim] \
+            .view(DTYPES[dtype_code]).reshape(count, dim)
+        self.snapshot_at = snapshot_at
+        self.cohort_id = stats_cohort_id.hex() if any(stats_cohort_id) else None
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def get(self, user_id: str):
+        """(embedding view, enroll cohort stats or None), or None if the user is not in the snapshot.
+
+        Stats computed against a different cohort than the one loaded now are dropped.
+        """
+        i = self.index.get(user_id)
+        if i is None:
+            return None
+        cohort_mean, cohort_std = self.stats[i]
+        if np.isnan(cohort_mean):
+            return self.matrix[i], None
+        return self.matrix[i], current_stats(float(cohort_mean), float(cohort_std), self.cohort_id)
+
+def write_snapshot(path: str, user_ids, matrix, stats, snapshot_at: float, dtype: str = "float32",
+                   encrypt: bool = False, stats_cohort_id: str = None):
+    """Write a snapshot atomically. stats holds (cohort_mean, cohort_std) per row, NaN when missing,
+    all computed against the cohort identified by stats_cohort_id."""
+    count, dim = matrix.shape if len(user_ids) else (0, 256)
+    encoded = [user_id.encode() for user_id in user_ids]
+    offsets = np.zeros(count + 1, dtype="<u8")
+    offsets[1:] = np.cumsum([len(e) for e in encoded])
+
+    ids_offset = HEADER.size
+    stats_offset = _align(ids_offset + offsets.nbytes + int(offsets[-1]), 8)
+    matrix_offset = _align(stats_offset + 8 * count, 64)
+    header = HEADER.pack(MAGIC, VERSION, DTYPE_CODES[dtype], count, dim, 0, snapshot_at,
+                         ids_offset, stats_offset, matrix_offset,
+                         bytes.fromhex(stats_cohort_id) if stats_cohort_id else bytes(32))
+
+    body = bytearray(matrix_offset)
+    body[:HEADER.size] = header
+    body[ids_offset:ids_offset + offsets.nbytes] = offsets.tobytes()
+    body[ids_offset + offsets.nbytes:ids_offset + offsets.nbytes + int(offsets[-1])] = b"".join(encoded)
+    body[stats_offset:stats_offset + 8 * count] = np.asarray(stats, dtype="<f4").reshape(count, 2).tobytes()
+    body += np.ascontiguousarray(matrix, dtype=DTYPES[DTYPE_CODES[dtype]]).tobytes()
+    body += hashlib.sha256(body).digest()
+
+    data = ENCRYPTED_MAGIC + cipher.encrypt(bytes(body)) if encrypt else body
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def open_snapshot(path: str, verify: bool = True):
+    """Memory-map a plain snapshot (zero-copy), or decrypt an encrypted one in a single pass."""
+    with open(path, "rb") as f:
+        magic = f.read(len(ENCRYPTED_MAGIC))
+    if magic == ENCRYPTED_MAGIC:
+        with open(path, "rb") as f:
+            plain = cipher.decrypt(f.read()[len(ENCRYPTED_MAGIC):])
+        return Snapshot(np.frombuffer(plain, dtype=np.uint8), verify)
+    return Snapshot(np.memmap(path, dtype=np.uint8, mode="r"), verify)
+
+async def fetch_embeddings(db: AsyncSession, since: datetime = None):
+    """Decrypt every row (or only rows updated after `since`) into (user_ids, matrix, stats).
+
+    Only stats that belong to the currently loaded cohort are kept; the others are NaN.
+    """
+    query = select(VoiceEmbedding)
+    if since is not None:
+        query = query.filter(VoiceEmbedding.updated_at > since)
+    result = await db.execute(query.order_by(VoiceEmbedding.user_id))
+    records = result.scalars().all()
+
+    user_ids = [record.user_id for record in records]
+    matrix = np.array([decrypt_embedding(record.embedding) for record in records], dtype=np.float32)
+    stats = np.array([
+        current_stats(record.cohort_mean, record.cohort_std, record.cohort_id) or (np.nan, np.nan)
+        for record in records
+    ], dtype=np.float32)
+    return user_ids, matrix, stats
+
+async def export_snapshot(db: AsyncSession, path: str, dtype: str = "float32", encrypt: bool = False):
+    snapshot_at = time.time()  # Taken before reading so later changes show up as deltas
+    user_ids, matrix, stats = await fetch_embeddings(db)
+    write_snapshot(path, user_ids, matrix, stats, snapshot_at, dtype, encrypt, cohort_id)
+    return len(user_ids)
+
+async def import_snapshot(db: AsyncSession, snapshot: Snapshot):
+    """Upsert every snapshot row into voice_embeddings (e.g. to seed a new database)."""
+    for user_id in snapshot.user_ids:
+        embedding, enroll_stats = snapshot.get(user_id)
+        cohort_mean, cohort_std = enroll_stats if enroll_stats else (None, None)
+        await db.merge(VoiceEmbedding(
+            user_id=user_id,
+            embedding=encrypt_embedding(embedding.astype(np.float64).tolist()),
+            cohort_mean=cohort_mean,
+            cohort_std=cohort_std,
+            cohort_id=cohort_id if enroll_stats else None
+        ))
+    await db.commit()
+    return len(snapshot)
+
+async def warm_start(gallery, db: AsyncSession, path: str = SNAPSHOT_PATH):
+    """Attach a snapshot as the gallery's cold tier and apply the rows changed since it was exported."""
+    snapshot = open_snapshot(path)
+    gallery.attach_snapshot(snapshot)
+
+    since = datetime.fromtimestamp(snapshot.snapshot_at, timezone.utc).replace(tzinfo=None) \
+        - timedelta(seconds=DELTA_OVERLAP_SECONDS)
+    user_ids, matrix, stats = await fetch_embeddings(db, since)
+    for user_id, embedding, (cohort_mean, cohort_std) in zip(user_ids, matrix, stats):
+        gallery.invalidate(user_id)
+        enroll_stats = None if np.isnan(cohort_mean) else (float(cohort_mean), float(cohort_std))
+        gallery.put(user_id, embedding.astype(np.float64), enroll_stats)
+    return len(snapshot), len(user_ids)
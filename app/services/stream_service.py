@@ -0,0 +1,74 @@
+# app/services/stream_service.py
+from collections import deque
+from resemblyzer.hparams import sampling_rate, partials_n_frames, mel_window_step
+import numpy as np
+import os
+
+# Streams accept raw 16-bit little-endian mono PCM at the encoder's 16 kHz sampling rate
+STREAM_SAMPLE_RATE = sampling_rate
+WINDOW_SAMPLES = partials_n_frames * mel_window_step * sampling_rate // 1000  # 1.6 s partial utterance
+HOP_SAMPLES = int(float(os.getenv("STREAM_HOP_SECONDS", "0.8")) * sampling_rate)
+STREAM_WINDOWS = int(os.getenv("STREAM_WINDOWS", "6"))          # partial embeddings in the sliding window
+STREAM_MIN_WINDOWS = int(os.getenv("STREAM_MIN_WINDOWS", "3"))  # partials needed before deciding
+MAX_STREAMS = int(os.getenv("MAX_STREAMS_PER_WORKER", "8"))
+# Larger frames are rejected: each one is embedded window by window before the next is read
+MAX_FRAME_BYTES = int(float(os.getenv("STREAM_MAX_FRAME_SECONDS", "2")) * sampling_rate) * 2
+SILENCE_RMS = 1e-3  # windows quieter than this carry no speaker information
+
+if not 0 < HOP_SAMPLES <= WINDOW_SAMPLES:
+    raise ValueError("STREAM_HOP_SECONDS must be greater than 0 and at most 1.6")
+
+active_streams = 0
+
+def try_acquire_stream():
+    """Reserve a stream slot on this worker; False when the per-worker limit is reached."""
+    global active_streams
+    if active_streams >= MAX_STREAMS:
+        return False
+    active_streams += 1
+    return True
+
+def release_stream():
+    global active_streams
+    active_streams -= 1
+
+class StreamingVerifier:
+    """Sliding window of partial-utterance embeddings scored against one enrolled embedding."""
+
+    def __init__(self, enrolled_embedding, threshold=0.85):
+        self.enrolled = enrolled_embedding / np.linalg.norm(enrolled_embedding)
+        self.threshold = threshold
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.pending_byte = b""  # Odd trailing byte of a frame, completed by the next one
+        self.partials = deque(maxlen=STREAM_WINDOWS)
+        self.samples_seen = 0
+
+    def feed(self, pcm_bytes: bytes):
+        """Append PCM bytes and return the 1.6 s windows that are now ready to be embedded."""
+        pcm_bytes = self.pending_byte + pcm_bytes
+        usable = len(pcm_bytes) - len(pcm_bytes) % 2
+        self.pending_byte = pcm_bytes[usable:]
+        samples = np.frombuffer(pcm_bytes[:usable], dtype="<i2").astype(np.float32) / 32768.0
+        self.buffer = np.concatenate([self.buffer, samples])
+        self.samples_seen += len(samples)
+
+        windows = []
+        while len(self.buffer) >= WINDOW_SAMPLES:
+            window = self.buffer[:WINDOW_SAMPLES]
+            if np.sqrt(np.mean(window ** 2)) > SILENCE_RMS:
+                windows.append(window)
+            self.buffer = self.buffer[HOP_SAMPLES:]
+        return windows
+
+    def add_partial(self, embedding):
+        self.partials.append(embedding)
+
+    def score(self):
+        """Rolling similarity of the windowed partials and the current decision."""
+        if not self.partials:
+            return None, "pending"
+        rolling = np.mean(self.partials, axis=0)
+        similarity = float(np.dot(rolling / np.linalg.norm(rolling), self.enrolled))
+        if len(self.partials) < STREAM_MIN_WINDOWS:
+            return similarity, "pending"
+        return similarity, "verified" if similarity > self.threshold else "not_verified"
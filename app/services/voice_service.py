@@ -1,13 +1,83 @@
 # app/services/voice_service.py
-from resemblyzer import VoiceEncoder, preprocess_wav
+from resemblyzer import VoiceEncoder, preprocess_wav, normalize_volume, wav_to_mel_spectrogram
+from resemblyzer.hparams import audio_norm_target_dBFS, sampling_rate
+from app.services.inference_backend import create_backend
+from app.services.profiling import traced, span
 import numpy as np
 import soundfile as sf
+import librosa
 import io
 
-encoder = VoiceEncoder()
+backend = create_backend()
 
+def _utterance_mels(wav: np.ndarray, rate: float = 1.3, min_coverage: float = 0.75):
+    """Partial-utterance mel spectrograms and wav slices, as VoiceEncoder.embed_utterance splits them."""
+    wav_slices, mel_slices = VoiceEncoder.compute_partial_slices(len(wav), rate, min_coverage)
+    max_wave_length = wav_slices[-1].stop
+    if max_wave_length >= len(wav):
+        wav = np.pad(wav, (0, max_wave_length - len(wav)), "constant")
+    mel = wav_to_mel_spectrogram(wav)
+    return np.array([mel[s] for s in mel_slices]), wav_slices
+
+def _mean_embedding(partial_embeds: np.ndarray):
+    raw_embed = partial_embeds.mean(axis=0)
+    return raw_embed / np.linalg.norm(raw_embed, 2)
+
+@traced("voice.extract_embedding")
 def extract_embedding(audio_bytes: bytes):
     """Convert uploaded audio to voice embedding."""
-    wav, _ = sf.read(io.BytesIO(audio_bytes))
-    embedding = encoder.embed_utterance(preprocess_wav(wav))
-    return embedding
+    with span("voice.preprocess"):
+        wav, _ = sf.read(io.BytesIO(audio_bytes))
+        mels, _ = _utterance_mels(preprocess_wav(wav))
+    with span("voice.inference"):
+        return _mean_embedding(backend.embed_frames(mels))
+
+def embed_window(wav: np.ndarray):
+    """Embed one 1.6 s partial-utterance window of 16 kHz float PCM (streaming, no VAD trimming)."""
+    wav = normalize_volume(wav, audio_norm_target_dBFS, increase_only=True)
+    mels, _ = _utterance_mels(wav)
+    return _mean_embedding(backend.embed_frames(mels))
+
+@traced("voice.extract_segment_embeddings")
+def extract_segment_embeddings(audio_bytes: bytes, rate: float = 1.3):
+    """Per-window embeddings of a long recording in one batched pass, with their (start, end) seconds.
+
+    Silences are kept (no VAD trimming) so that the windows line up with the original timeline.
+    """
+    wav, source_sr = sf.read(io.BytesIO(audio_bytes))
+    if wav.ndim > 1:
+        wav = wav.mean(axis=1)
+    if source_sr != sampling_rate:
+        wav = librosa.resample(wav, orig_sr=source_sr, target_sr=sampling_rate)
+    wav = normalize_volume(wav, audio_norm_target_dBFS, increase_only=True)
+
+    mels, wav_slices = _utterance_mels(wav, rate=rate)
+    partial_embeds = backend.embed_frames(mels)
+    ranges = [(s.start / sampling_rate, min(s.stop, len(wav)) / sampling_rate) for s in wav_slices]
+    return partial_embeds, ranges
+
+@traced("voice.extract_embeddings_batch")
+def extract_embeddings_batch(audio_list):
+    """Embed several uploads with a single forward pass over all their partial utterances.
+
+    Returns one entry per upload: the embedding, or the exception raised while decoding it.
+    """
+    results = [None] * len(audio_list)
+    batch = []  # (index, partial mels)
+    for i, audio_bytes in enumerate(audio_list):
+        try:
+            wav, _ = sf.read(io.BytesIO(audio_bytes))
+            batch.append((i, _utterance_mels(preprocess_wav(wav))[0]))
+        except Exception as e:
+            results[i] = e
+
+    if not batch:
+        return results
+
+    partial_embeds = backend.embed_frames(np.concatenate([mels for _, mels in batch]))
+
+    start = 0
+    for i, mels in batch:
+        results[i] = _mean_embedding(partial_embeds[start:start + len(mels)])
+        start += len(mels)
+    return results
@@ -0,0 +1,29 @@
+import os
+import sys
+import numpy as np
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.services.voice_service import extract_embedding
+
+load_dotenv()
+COHORT_PATH = os.getenv("COHORT_PATH", "cohort.npy")
+
+def build_cohort(audio_dir, output_path):
+    """Embed every .wav file in audio_dir (one per cohort speaker) into a float32 .npy matrix."""
+    embeddings = []
+    for name in sorted(os.listdir(audio_dir)):
+        if not name.endswith(".wav"):
+            continue
+        with open(os.path.join(audio_dir, name), "rb") as f:
+            embeddings.append(extract_embedding(f.read()))
+
+    matrix = np.array(embeddings, dtype=np.float32)
+    np.save(output_path, matrix)
+    print(f"Saved cohort of {len(matrix)} embeddings to: {output_path}")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python db_scripts/build_cohort.py <cohort_audio_dir> [output.npy]")
+        sys.exit(1)
+    build_cohort(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else COHORT_PATH)
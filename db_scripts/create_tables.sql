@@ -2,5 +2,11 @@ DROP TABLE IF EXISTS voice_embeddings;
 
 CREATE TABLE voice_embeddings (
     user_id VARCHAR PRIMARY KEY,
-    embedding TEXT NOT NULL
+    embedding TEXT NOT NULL,
+    cohort_mean DOUBLE PRECISION,
+    cohort_std DOUBLE PRECISION,
+    cohort_id VARCHAR(64),
+    updated_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
 );
+
+CREATE INDEX ix_voice_embeddings_updated_at ON voice_embeddings (updated_at);
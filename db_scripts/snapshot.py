@@ -0,0 +1,51 @@
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.db.database import AsyncSessionLocal
+from app.services.snapshot_service import export_snapshot, import_snapshot, open_snapshot
+
+async def run_export(args):
+    async with AsyncSessionLocal() as db:
+        count = await export_snapshot(db, args.path, args.dtype, args.encrypt)
+    print(f"Exported {count} voiceprints to: {args.path}")
+
+async def run_import(args):
+    snapshot = open_snapshot(args.path)
+    async with AsyncSessionLocal() as db:
+        count = await import_snapshot(db, snapshot)
+    print(f"Imported {count} voiceprints from: {args.path}")
+
+def run_info(args):
+    snapshot = open_snapshot(args.path)
+    print(f"Snapshot: {args.path}")
+    print(f"   Voiceprints: {len(snapshot)}")
+    print(f"   Matrix: {snapshot.matrix.shape} {snapshot.matrix.dtype}")
+    print(f"   Exported at: {datetime.fromtimestamp(snapshot.snapshot_at).isoformat()}")
+    print("   Checksum: OK")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export/import voiceprint snapshots")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_cmd = commands.add_parser("export", help="Write all voice_embeddings rows to a snapshot")
+    export_cmd.add_argument("path")
+    export_cmd.add_argument("--dtype", choices=["float32", "float16"], default="float32")
+    export_cmd.add_argument("--encrypt", action="store_true", help="Encrypt the snapshot with FERNET_KEY")
+
+    import_cmd = commands.add_parser("import", help="Upsert a snapshot into voice_embeddings")
+    import_cmd.add_argument("path")
+
+    info_cmd = commands.add_parser("info", help="Verify a snapshot and print its summary")
+    info_cmd.add_argument("path")
+
+    args = parser.parse_args()
+    if args.command == "export":
+        asyncio.run(run_export(args))
+    elif args.command == "import":
+        asyncio.run(run_import(args))
+    else:
+        run_info(args)
@@ -0,0 +1,8 @@
+# export_onnx_model.py
+from app.services.inference_backend import export_onnx, ONNX_MODEL_PATH, ONNX_INT8_MODEL_PATH
+
+if __name__ == "__main__":
+    export_onnx(ONNX_MODEL_PATH, ONNX_INT8_MODEL_PATH)
+    print(f"✅ Exported ONNX model: {ONNX_MODEL_PATH}")
+    print(f"✅ Exported int8 quantized model: {ONNX_INT8_MODEL_PATH}")
+    print("Set INFERENCE_BACKEND=onnx (or onnx-int8) to use it.")
@@ -1,8 +1,40 @@
 from fastapi import FastAPI
 from app.routes.auth_routes import router as auth_router
 from app.routes.phrase_routes import router as phrase_router
+from app.routes.admin_routes import router as admin_router
+from app.services.gallery_service import gallery
+from app.services.enrollment_service import enrollment_pool
+from app.services.snapshot_service import SNAPSHOT_PATH, warm_start
+from app.services.rate_limiter import RateLimitMiddleware
+from app.services.profiling import ProfilingMiddleware
+from app.db.database import AsyncSessionLocal
 
 app = FastAPI()
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(ProfilingMiddleware)
+
+@app.on_event("startup")
+async def start_gallery():
+    await gallery.start()
+
+@app.on_event("startup")
+async def warm_start_gallery():
+    if SNAPSHOT_PATH:
+        async with AsyncSessionLocal() as db:
+            loaded, deltas = await warm_start(gallery, db, SNAPSHOT_PATH)
+        print(f"Gallery warm start: {loaded} voiceprints from snapshot, {deltas} deltas applied")
+
+@app.on_event("startup")
+async def start_enrollment_workers():
+    await enrollment_pool.start()
+
+@app.on_event("shutdown")
+async def stop_gallery():
+    await gallery.stop()
+
+@app.on_event("shutdown")
+async def stop_enrollment_workers():
+    await enrollment_pool.stop()
 
 @app.get("/health")
 def health_check():
@@ -11,4 +43,5 @@ def health_check():
 # Include Routers
 app.include_router(phrase_router, prefix="/phrase", tags=["Liveness"])
 app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
+app.include_router(admin_router, prefix="/admin", tags=["Admin"])
 
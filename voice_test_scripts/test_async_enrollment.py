@@ -0,0 +1,47 @@
+# test_async_enrollment.py
+import requests
+import time
+
+BASE_URL = "http://127.0.0.1:8000"
+USER_ID = "test_user_async_001"
+TIMEOUT_SECONDS = 60
+
+print("="*50)
+print("⏳ TESTING ASYNC ENROLLMENT")
+print("="*50)
+
+try:
+    with open('../test_audio/enrollment_sample.wav', 'rb') as f:
+        files = {'file': f}
+        response = requests.post(f'{BASE_URL}/auth/enroll/{USER_ID}/async', files=files)
+
+    if response.status_code != 202:
+        print(f"❌ Failed to queue: {response.status_code}")
+        print(f"Response: {response.text}")
+    else:
+        job_id = response.json()['job_id']
+        print(f"✅ Queued job: {job_id}")
+
+        start = time.time()
+        status = "queued"
+        while status in ("queued", "processing") and time.time() - start < TIMEOUT_SECONDS:
+            time.sleep(0.5)
+            job = requests.get(f'{BASE_URL}/auth/jobs/{job_id}').json()
+            status = job['status']
+            print(f"   {time.time() - start:5.1f}s  status={status}")
+
+        if status == "done":
+            print(f"\n✅ SUCCESS: {USER_ID} enrolled asynchronously")
+            with open('../test_audio/verification_sample.wav', 'rb') as f:
+                result = requests.post(f'{BASE_URL}/auth/verify/{USER_ID}', files={'file': f}).json()
+            print(f"   Verified: {'✅ YES' if result['verified'] else '❌ NO'}")
+            print(f"   Similarity Score: {result['voice_similarity']:.4f}")
+        elif status == "failed":
+            print(f"\n❌ Job failed: {job['error']}")
+        else:
+            print(f"\n❌ Job still '{status}' after {TIMEOUT_SECONDS}s")
+
+except FileNotFoundError:
+    print("❌ File not found. Make sure enrollment_sample.wav exists in test_audio folder")
+except Exception as e:
+    print(f"❌ Error: {e}")
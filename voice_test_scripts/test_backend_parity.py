@@ -0,0 +1,63 @@
+# test_backend_parity.py
+# Run from the project root after `python export_onnx_model.py`:
+#   python voice_test_scripts/test_backend_parity.py
+import os
+import sys
+import time
+import numpy as np
+import soundfile as sf
+from resemblyzer import preprocess_wav
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.services.inference_backend import (TorchBackend, OnnxBackend, INFERENCE_THREADS,
+                                            ONNX_MODEL_PATH, ONNX_INT8_MODEL_PATH)
+from app.services.voice_service import _utterance_mels
+
+FILES = [
+    "test_audio/enrollment_sample.wav",
+    "test_audio/verification_sample.wav",
+    "test_audio/impostor_sample.wav"
+]
+TOLERANCE = {"onnx": 0.9999, "onnx-int8": 0.99}  # Minimum cosine similarity to the torch embedding
+
+def utterance_mels(path):
+    wav, rate = sf.read(path)
+    if wav.ndim > 1:
+        wav = wav.mean(axis=1)
+    return _utterance_mels(preprocess_wav(wav, source_sr=rate))[0]
+
+def embed(backend, mels):
+    start = time.perf_counter()
+    partial_embeds = backend.embed_frames(mels)
+    elapsed = time.perf_counter() - start
+    raw_embed = partial_embeds.mean(axis=0)
+    return raw_embed / np.linalg.norm(raw_embed), elapsed
+
+print("="*50)
+print("⚖️  TESTING INFERENCE BACKEND PARITY")
+print("="*50)
+
+reference = TorchBackend(INFERENCE_THREADS)
+candidates = [OnnxBackend(ONNX_MODEL_PATH, INFERENCE_THREADS)]
+if os.path.exists(ONNX_INT8_MODEL_PATH):
+    candidates.append(OnnxBackend(ONNX_INT8_MODEL_PATH, INFERENCE_THREADS, name="onnx-int8"))
+
+failed = False
+for path in FILES:
+    if not os.path.exists(path):
+        print(f"❌ {path} not found")
+        continue
+
+    mels = utterance_mels(path)
+    expected, torch_time = embed(reference, mels)
+    print(f"\n{path} ({len(mels)} partials) torch: {torch_time * 1000:.1f} ms")
+    for backend in candidates:
+        actual, elapsed = embed(backend, mels)
+        similarity = float(np.dot(expected, actual))
+        ok = similarity >= TOLERANCE[backend.name]
+        failed = failed or not ok
+        print(f"   {'✅' if ok else '❌'} {backend.name}: cosine={similarity:.6f} "
+              f"max_abs_diff={np.abs(expected - actual).max():.2e} time={elapsed * 1000:.1f} ms")
+
+print("\n❌ PARITY FAILED" if failed else "\n✅ All backends match within tolerance")
+sys.exit(1 if failed else 0)
@@ -0,0 +1,137 @@
+# test_rate_limiter.py
+# Drives RateLimitMiddleware with a stub app and a fake clock; no model, database or server needed.
+# Run from the project root:
+#   python voice_test_scripts/test_rate_limiter.py
+import asyncio
+import math
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.services.rate_limiter import (RateLimitMiddleware, InMemoryRateLimitBackend, InferenceBudget,
+                                       CLIENT_RATE, CLIENT_BURST, USER_RATE, USER_BURST)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class StubApp:
+    """Answers 200, holding requests to paths ending in /hold until `gate` is set."""
+
+    def __init__(self):
+        self.calls = []
+        self.gate = asyncio.Event()
+
+    async def __call__(self, scope, receive, send):
+        self.calls.append(scope["path"])
+        if scope["path"].endswith("/hold"):
+            await self.gate.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+async def post(middleware, path, client="10.0.0.1", headers=()):
+    """(status, headers, whether the request body was read)."""
+    scope = {"type": "http", "method": "POST", "path": path, "client": (client, 50000),
+             "headers": [(b"content-length", b"88200"), *headers]}
+    messages = []
+    body_read = []
+
+    async def receive():
+        body_read.append(True)
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    return messages[0]["status"], dict(messages[0]["headers"]), bool(body_read)
+
+def new_middleware(max_concurrency=4):
+    clock = FakeClock()
+    app = StubApp()
+    middleware = RateLimitMiddleware(app, InMemoryRateLimitBackend(clock=clock),
+                                     InferenceBudget(max_concurrency=max_concurrency))
+    return middleware, app, clock
+
+async def check_user_burst():
+    middleware, app, clock = new_middleware()
+    for i in range(int(USER_BURST)):
+        status, _, _ = await post(middleware, "/auth/verify/u1", client=f"10.0.0.{i}")
+        assert status == 200, f"request {i + 1} of the burst got {status}"
+
+    status, headers, body_read = await post(middleware, "/auth/verify/u1", client="10.0.1.1")
+    assert status == 429, status
+    assert headers[b"retry-after"] == str(max(1, math.ceil(1 / USER_RATE))).encode(), headers
+    assert not body_read, "rejected request read the upload"
+    assert len(app.calls) == int(USER_BURST)
+
+    clock.now += 1 / USER_RATE  # One token refilled
+    status, _, _ = await post(middleware, "/auth/verify/u1", client="10.0.1.2")
+    assert status == 200, status
+
+async def check_client_burst():
+    middleware, _, _ = new_middleware()
+    for i in range(int(CLIENT_BURST)):
+        status, _, _ = await post(middleware, f"/auth/verify/user{i}")
+        assert status == 200, f"request {i + 1} of the burst got {status}"
+    status, headers, _ = await post(middleware, "/auth/verify/another_user")
+    assert status == 429, status
+    assert headers[b"retry-after"] == str(max(1, math.ceil(1 / CLIENT_RATE))).encode(), headers
+
+    # Callers can't reset their bucket with a header unless RATE_LIMIT_CLIENT_HEADER names it
+    status, _, _ = await post(middleware, "/auth/verify/another_user", headers=[(b"x-api-key", b"fresh")])
+    assert status == 429, status
+
+async def check_budget():
+    middleware, app, _ = new_middleware(max_concurrency=1)
+    held = asyncio.create_task(post(middleware, "/auth/verify/u1/hold"))
+    await asyncio.sleep(0)
+    assert middleware.budget.active == 1
+
+    status, _, body_read = await post(middleware, "/auth/verify/u2", client="10.0.0.2")
+    assert status == 429 and not body_read, status
+    # Only async enrollment skips the budget, not a user named "async"
+    status, _, _ = await post(middleware, "/auth/enroll/u3/async", client="10.0.0.3")
+    assert status == 200, status
+    for path in ("/auth/enroll/async", "/auth/verify/async", "/auth/segments/async"):
+        status, _, _ = await post(middleware, path, client="10.0.0.4")
+        assert status == 429, f"{path} got {status} while the budget was full"
+
+    app.gate.set()
+    assert (await held)[0] == 200
+    assert middleware.budget.active == 0 and middleware.budget.audio_seconds == 0
+    status, _, _ = await post(middleware, "/auth/verify/u2", client="10.0.0.5")
+    assert status == 200, status
+
+async def check_pruning():
+    clock = FakeClock()
+    backend = InMemoryRateLimitBackend(prune_interval=10, clock=clock)
+    await backend.take("fast", rate=10, burst=1)   # full again after 0.1 s
+    await backend.take("slow", rate=0.01, burst=1)  # full again after 100 s
+    clock.now += 11
+    await backend.take("new", rate=1, burst=1)
+    assert sorted(backend.buckets) == ["new", "slow"], sorted(backend.buckets)
+
+print("="*50)
+print("🚦 TESTING RATE LIMITING")
+print("="*50)
+
+failures = 0
+for name, check in [("per-user burst and Retry-After", check_user_burst),
+                    ("per-client burst", check_client_burst),
+                    ("inference budget", check_budget),
+                    ("bucket pruning", check_pruning)]:
+    try:
+        asyncio.run(check())
+        print(f"   ✅ {name}")
+    except Exception as e:
+        failures += 1
+        print(f"   ❌ {name}: {e!r}")
+
+if failures:
+    print(f"\n❌ {failures} rate limiting check(s) failed")
+else:
+    print("\n✅ SUCCESS: limits, Retry-After and the inference budget behave as configured")
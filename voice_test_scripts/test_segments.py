@@ -0,0 +1,61 @@
+# test_segments.py
+import requests
+
+BASE_URL = "http://127.0.0.1:8000"
+USER_ID = "test_user_001"
+SECOND_USER_ID = "test_user_async_001"  # enrolled by test_async_enrollment.py
+
+def check_consistency(result):
+    """Every matching window lies in a matched range, and every matched range starts and ends on one."""
+    matches = [s for s in result['segments'] if s['match']]
+    for s in matches:
+        assert any(start <= s['start'] and s['end'] <= end for start, end in result['matched_ranges']), s
+    for start, end in result['matched_ranges']:
+        assert any(s['start'] == start for s in matches), (start, end)
+        assert any(s['end'] == end for s in matches), (start, end)
+    ratio = len(matches) / len(result['segments']) if result['segments'] else 0.0
+    assert abs(result['match_ratio'] - ratio) < 1e-3, (result['match_ratio'], ratio)
+
+def print_result(result):
+    print(f"   Windows: {len(result['segments'])}  Match ratio: {result['match_ratio']}")
+    print(f"   Matched ranges: {result['matched_ranges']}")
+
+print("="*50)
+print("🎞️  TESTING SEGMENT SCORING")
+print("="*50)
+
+try:
+    with open('../test_audio/verification_sample.wav', 'rb') as f:
+        files = {'file': f}
+        response = requests.post(f'{BASE_URL}/auth/segments/{USER_ID}', files=files)
+
+    if response.status_code != 200:
+        print(f"❌ API Error: {response.status_code}")
+        print(f"Response: {response.text}")
+    else:
+        result = response.json()
+        print(f"📊 {USER_ID}:")
+        print_result(result)
+        check_consistency(result)
+        print("✅ Segments and matched ranges are consistent")
+
+        # Served from the window cache, no upload or inference
+        # (only on the worker that cached it: run the server with a single worker)
+        audio_id = result['audio_id']
+        response = requests.get(f'{BASE_URL}/auth/segments/{audio_id}/score/{SECOND_USER_ID}')
+        if response.status_code != 200:
+            print(f"❌ Re-score failed: {response.status_code} {response.text}")
+        else:
+            rescored = response.json()
+            print(f"\n📊 {SECOND_USER_ID} (re-scored by audio_id):")
+            print_result(rescored)
+            check_consistency(rescored)
+            assert [s['start'] for s in rescored['segments']] == [s['start'] for s in result['segments']]
+            print("✅ Re-scored the same windows against a second user")
+
+except FileNotFoundError:
+    print("❌ File not found. Make sure verification_sample.wav exists in test_audio folder")
+except AssertionError as e:
+    print(f"❌ Inconsistent response: {e}")
+except Exception as e:
+    print(f"❌ Error: {e}")
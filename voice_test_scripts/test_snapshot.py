@@ -0,0 +1,83 @@
+# test_snapshot.py
+# Round-trips the gallery snapshot format without a model or database (needs FERNET_KEY in .env).
+# Run from the project root:
+#   python voice_test_scripts/test_snapshot.py
+import os
+import sys
+import tempfile
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.services.cohort_service import cohort_id
+from app.services.snapshot_service import write_snapshot, open_snapshot
+
+USER_IDS = ["alice", "bob", "çarlie"]  # non-ASCII ids exercise the utf-8 offset table
+TOLERANCE = {"float32": 1e-7, "float16": 1e-3}  # Max abs error of a unit-norm embedding value
+
+def sample_data():
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((len(USER_IDS), 256)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    stats = np.array([(0.1, 0.2), (np.nan, np.nan), (0.3, 0.4)], dtype=np.float32)  # bob has no stats
+    return matrix, stats
+
+def check_round_trip(path, dtype, encrypt):
+    matrix, stats = sample_data()
+    write_snapshot(path, USER_IDS, matrix, stats, 123.5, dtype, encrypt, cohort_id)
+    snapshot = open_snapshot(path)
+
+    assert snapshot.user_ids == USER_IDS, snapshot.user_ids
+    assert snapshot.snapshot_at == 123.5, snapshot.snapshot_at
+    assert snapshot.get("dave") is None
+    for i, user_id in enumerate(USER_IDS):
+        embedding, enroll_stats = snapshot.get(user_id)
+        error = float(np.abs(embedding.astype(np.float32) - matrix[i]).max())
+        assert error <= TOLERANCE[dtype], f"{user_id}: max error {error}"
+        if np.isnan(stats[i][0]):
+            assert enroll_stats is None, enroll_stats
+        else:
+            assert np.allclose(enroll_stats, stats[i]), enroll_stats
+    # The matrix is viewed in place, 64-byte aligned for vectorized scoring (plain snapshots only)
+    if not encrypt:
+        assert snapshot.matrix.ctypes.data % 64 == 0
+
+def check_empty(path):
+    write_snapshot(path, [], np.zeros((0, 256), dtype=np.float32), np.zeros((0, 2)), 1.0)
+    assert len(open_snapshot(path)) == 0
+
+def check_tampered(path):
+    matrix, stats = sample_data()
+    write_snapshot(path, USER_IDS, matrix, stats, 123.5)
+    data = bytearray(open(path, "rb").read())
+    data[len(data) // 2] ^= 1  # Flip one bit inside the matrix
+    with open(path, "wb") as f:
+        f.write(data)
+    try:
+        open_snapshot(path)
+    except ValueError as e:
+        assert "checksum mismatch" in str(e), e
+        return
+    raise AssertionError("tampered snapshot was accepted")
+
+print("="*50)
+print("🗄️  TESTING GALLERY SNAPSHOTS")
+print("="*50)
+
+failures = 0
+with tempfile.TemporaryDirectory() as tmp:
+    path = os.path.join(tmp, "gallery.snap")
+    checks = [(f"{dtype}{' encrypted' if encrypt else ''}", check_round_trip, (path, dtype, encrypt))
+              for encrypt in (False, True) for dtype in ("float32", "float16")]
+    checks += [("empty snapshot", check_empty, (path,)), ("tampered snapshot", check_tampered, (path,))]
+    for name, check, args in checks:
+        try:
+            check(*args)
+            print(f"   ✅ {name}")
+        except Exception as e:
+            failures += 1
+            print(f"   ❌ {name}: {e}")
+
+if failures:
+    print(f"\n❌ {failures} snapshot check(s) failed")
+else:
+    print("\n✅ SUCCESS: snapshots round-trip and tampering is detected")
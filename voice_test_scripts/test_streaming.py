@@ -0,0 +1,38 @@
+# test_streaming.py
+import asyncio
+import json
+import numpy as np
+import soundfile as sf
+import websockets
+from resemblyzer import preprocess_wav
+
+WS_URL = "ws://127.0.0.1:8000"
+USER_ID = "test_user_001"
+CHUNK_SECONDS = 0.2  # Simulate a live call sending 200 ms frames
+
+async def stream_file(path):
+    wav, rate = sf.read(path)
+    if wav.ndim > 1:
+        wav = wav.mean(axis=1)
+    wav = preprocess_wav(wav, source_sr=rate)  # resample to 16 kHz
+    pcm = (np.clip(wav, -1, 1) * 32767).astype("<i2").tobytes()
+    chunk = int(16000 * CHUNK_SECONDS) * 2
+
+    async with websockets.connect(f"{WS_URL}/auth/stream/{USER_ID}") as ws:
+        for start in range(0, len(pcm), chunk):
+            await ws.send(pcm[start:start + chunk])
+            try:
+                result = json.loads(await asyncio.wait_for(ws.recv(), timeout=CHUNK_SECONDS))
+                print(f"   {result['seconds']:>5}s  similarity={result['voice_similarity']}  "
+                      f"decision={result['decision']}")
+            except asyncio.TimeoutError:
+                pass
+
+print("="*50)
+print("📡 TESTING STREAMING VERIFICATION")
+print("="*50)
+
+try:
+    asyncio.run(stream_file('../test_audio/verification_sample.wav'))
+except Exception as e:
+    print(f"❌ Error: {e}")